@@ -1,44 +1,180 @@
 """Define the background task to fetch messages from the S3I message broker."""
 
+import asyncio
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+
 import anvil.server
 
-from ..camera.models import ImageValue
-from ..s3i import global_broker as broker
-from ..s3i.message_models import S3IMessage
+from ..camera.jpeg import check_and_hash
+from ..camera.models import validate_image_value
+from ..s3i import get_broker, new_async_client
+from ..s3i.message_models import validate_s3i_message
 from . import bg_logger
 
 logger = bg_logger.getChild("fetch_messages")
 
+# Created once at import. Anvil usually starts a fresh process per background task, but a reused process reuses the
+# worker threads.
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fetch_messages")
+
+# Maximum number of exceptions attached to the raised ExceptionGroup. Any further exceptions are only logged.
+MAX_ERRORS = 32
+
+# Keys of recently handled messages and of messages currently being handled, used to skip messages the broker delivers
+# more than once. As the cache lives in the process, it mainly catches duplicates within a single batch, and only keeps
+# keys between runs if Anvil reuses the process.
+SEEN_CACHE_SIZE = 256
+_seen_keys: OrderedDict[Hashable, None] = OrderedDict()
+_in_flight_keys: set[Hashable] = set()
+_seen_lock = threading.Lock()
+
+
+def _claim(key: Hashable) -> bool:
+    """Claim a message key for handling, unless the message was handled recently or is currently being handled.
+
+    Checking and claiming happens atomically, as all messages of a batch are handed to the thread pool at once.
+
+    Args:
+        key (Hashable): A key identifying the message.
+
+    Returns:
+        bool: True if the key was claimed, False if the message is a duplicate.
+    """
+    with _seen_lock:
+        if key in _seen_keys:
+            _seen_keys.move_to_end(key)
+            return False
+        if key in _in_flight_keys:
+            return False
+        _in_flight_keys.add(key)
+        return True
+
+
+def _release(keys: list[Hashable], handled: bool):
+    """Release claimed message keys, remembering them if the message was handled successfully.
+
+    Keys of messages that failed are forgotten, so the message is handled again when it is redelivered.
 
-def is_image_message(message: S3IMessage) -> bool:
-    """Check if the message is an image message."""
-    return message.root.messageType == "getValueReply" and message.root.value.get("type") == "b64 jpeg"
+    Args:
+        keys (list[Hashable]): The claimed keys.
+        handled (bool): Whether the message was handled successfully.
+    """
+    with _seen_lock:
+        for key in keys:
+            _in_flight_keys.discard(key)
+            if handled:
+                _seen_keys[key] = None
+                _seen_keys.move_to_end(key)
+        while len(_seen_keys) > SEEN_CACHE_SIZE:
+            _seen_keys.popitem(last=False)
 
 
-def handle_single_message(response_text: str):
-    """Handle a single message."""
-    message = S3IMessage.model_validate_json(response_text)
+def _is_image_raw(raw_message: dict) -> bool:
+    """Check if the raw, not yet validated, message is an image message."""
+    value = raw_message.get("value")
+    return (
+        raw_message.get("messageType") == "getValueReply"
+        and isinstance(value, dict)
+        and value.get("type") == "b64 jpeg"
+    )
 
-    if is_image_message(message):
-        value = ImageValue.model_validate(message.root.value)  # noqa: F841
+
+def handle_single_message(raw_message: dict):
+    """Handle a single, already JSON-decoded message.
+
+    Messages that are not image messages or that were already handled successfully are dropped before any validation
+    takes place.
+    """
+    if not _is_image_raw(raw_message):
+        # No handler exists for these messages yet. Log them, as they have already been removed from the queue.
+        logger.warning(
+            "Dropping unsupported %s message %s.", raw_message.get("messageType"), raw_message.get("identifier")
+        )
+        return
+
+    # The key is only trusted if it is a string, anything else is left for validation to reject.
+    replying_to = raw_message.get("replyingToMessage")
+    claimed_keys = []
+    if isinstance(replying_to, str):
+        if not _claim(replying_to):
+            logger.debug("Skipping duplicate reply to %s.", replying_to)
+            return
+        claimed_keys.append(replying_to)
+
+    handled = False
+    try:
+        message = validate_s3i_message(raw_message)
+        value = validate_image_value(message.value)
+
+        # The same image may also arrive in replies to different requests.
+        image_hash = check_and_hash(value.image)
+        if not _claim(image_hash):
+            logger.debug("Skipping duplicate image %s taken at %d.", value.path, value.takenAt)
+            handled = True
+            return
+        claimed_keys.append(image_hash)
         # TODO: Save the image to the database
 
+        handled = True
+    finally:
+        _release(claimed_keys, handled)
+
+
+async def _fetch_and_handle_messages() -> list:
+    """Fetch all queued messages and events concurrently and handle them in the thread pool.
+
+    Returns:
+        list: The exceptions of failed fetches, followed by the result of handling each message, which is either None
+            or the exception that occurred.
+    """
+    broker = get_broker()
+    # A new client per run, as its connections are bound to the event loop of this `asyncio.run`.
+    async with new_async_client() as client:
+        # Fetch all queued messages of each queue in a single request instead of one round-trip per message. A failing
+        # queue must not prevent handling the other one, as its messages have already been removed from the broker.
+        fetched = await asyncio.gather(
+            broker.areceive(client, all=True),
+            broker.areceive(client, event=True, all=True),
+            return_exceptions=True,
+        )
+
+    raw_messages = []
+    fetch_errors = []
+    for result in fetched:
+        if isinstance(result, Exception):
+            fetch_errors.append(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            raw_messages.extend(result)
+
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(_POOL, handle_single_message, raw_message) for raw_message in raw_messages]
+    return fetch_errors + await asyncio.gather(*futures, return_exceptions=True)
+
 
 @anvil.server.background_task
 def fetch_s3i_messages():
     """Fetch messages from the S3I message broker a single time and do the appropriate tasks."""
-    # Currently just fetching a single message at a time, because a message can be pretty big.
-    exceptions = []
+    exceptions: list[Exception] = []
+    total_errors = 0
 
-    while (result := broker.receive()) is not None:
-        try:
-            _, response_text = result
-            handle_single_message(response_text)
-        except Exception as e:
-            exceptions.append(e)
+    for result in asyncio.run(_fetch_and_handle_messages()):
+        if isinstance(result, Exception):
+            total_errors += 1
+            if len(exceptions) < MAX_ERRORS:
+                exceptions.append(result)
+            else:
+                logger.error("Exception occurred while handling a message.", exc_info=result)
 
     if exceptions:
-        raise ExceptionGroup("Exceptions occurred while handling messages.", exceptions)
+        raise ExceptionGroup(
+            f"{total_errors} exceptions occurred while handling messages, first {len(exceptions)} attached.",
+            exceptions,
+        )
 
 
 @anvil.server.callable
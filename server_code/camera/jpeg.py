@@ -0,0 +1,23 @@
+"""Helpers for checking the JPEG images sent by the camera."""
+
+import hashlib
+
+# Every JPEG image starts with the start-of-image marker.
+JPEG_SOI = b"\xff\xd8"
+
+
+def check_and_hash(image: bytes | memoryview) -> int:
+    """Check that the image is a JPEG and compute a hash of its content.
+
+    Args:
+        image (bytes | memoryview): The decoded image.
+
+    Returns:
+        int: A 64 bit hash of the image content.
+
+    Raises:
+        ValueError: If the image does not start with the JPEG start-of-image marker.
+    """
+    if image[:2] != JPEG_SOI:
+        raise ValueError("The image is not a JPEG image, the start-of-image marker is missing.")
+    return int.from_bytes(hashlib.blake2b(image, digest_size=8).digest(), "big")
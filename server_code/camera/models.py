@@ -1,14 +1,53 @@
 """Defines the models used in the interaction with the camera."""
 
+from functools import cached_property
 from typing import Literal
 
-from pydantic import Base64Bytes, BaseModel
+import pybase64
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+def decode_b64_view(b64: str | bytes) -> memoryview:
+    """Decode base64 data and return a read-only view of the result.
+
+    The view is read-only so a cached decoded image cannot be modified by one of its readers.
+
+    Args:
+        b64 (str | bytes): The base64 encoded data.
+
+    Returns:
+        memoryview: A read-only view of the decoded data.
+    """
+    return memoryview(pybase64.b64decode_as_bytearray(b64, validate=True)).toreadonly()
 
 
 class ImageValue(BaseModel):
-    """The value the camera sends containing the image and some metadata. Used in getValueReplies and in events."""
+    """The value the camera sends containing the image and some metadata. Used in getValueReplies and in events.
+
+    The image is kept base64 encoded during validation and only decoded when `image` is first accessed.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     type: Literal["b64 jpeg"]
     path: str
     takenAt: int
-    image: Base64Bytes
+    image_b64: str = Field(alias="image")
+
+    @field_validator("image_b64")
+    @classmethod
+    def _check_image_b64(cls, value: str) -> str:
+        """Sanity check the encoded image without decoding all of it."""
+        if len(value) % 4 != 0:
+            raise ValueError("The base64 encoded image has an invalid length.")
+        pybase64.b64decode(value[:64], validate=True)
+        return value
+
+    @cached_property
+    def image(self) -> memoryview:
+        """The decoded image."""
+        return decode_b64_view(self.image_b64)
+
+
+# Bound once at import to skip the `model_validate` wrapper on every message.
+validate_image_value = ImageValue.__pydantic_validator__.validate_python
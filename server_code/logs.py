@@ -27,6 +27,12 @@ logging.addLevelName(TRACE_LEVEL, "TRACE")
 logging.addLevelName(SUCCESS_LEVEL, "SUCCESS")
 logging.setLoggerClass(CustomLogger)
 
+# None of the handlers use the caller's source location, thread or process, so skip collecting them for every record.
+logging._srcfile = None
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
 
 def get_logger(name: str) -> logging.Logger:
     """Get a logger for a specific subsystem.
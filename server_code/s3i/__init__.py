@@ -1,20 +1,56 @@
 """Define global variables for the S3I module."""
 
+import functools
+from typing import TYPE_CHECKING
+
 import anvil.secrets
 import httpx
 
 from .. import logs
-from . import broker
 
-__all__ = ["global_client", "global_broker", "s3i_logger"]
+if TYPE_CHECKING:
+    from .broker import Broker
+
+__all__ = ["get_broker", "new_async_client", "s3i_logger"]
 
 s3i_logger = logs.get_logger("s3i")
 
-global_client = httpx.Client()
-_self_thing = broker.Thing(
-    id=anvil.secrets.get_secret("s3i_id"),
-    secret=anvil.secrets.get_secret("s3i_secret"),
-    message_queue=anvil.secrets.get_secret("s3i_message_queue"),
-    event_queue=anvil.secrets.get_secret("s3i_event_queue"),
-)
-global_broker = broker.Broker(_self_thing, client=global_client)
+_SECRET_NAMES = ("s3i_id", "s3i_secret", "s3i_message_queue", "s3i_event_queue")
+
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300.0)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+
+@functools.cache
+def get_broker() -> "Broker":
+    """Get the broker shared by the whole server, creating it on first use.
+
+    The secrets are only fetched when the broker is first needed, so importing this module does not block the server
+    start.
+
+    Returns:
+        Broker: The shared broker.
+    """
+    # Imported here, because the broker module itself depends on `s3i_logger`.
+    from .broker import Broker, Thing
+
+    # Fetched on the calling thread, as `get_secret` is an Anvil server call relying on the caller's call context.
+    thing_id, secret, message_queue, event_queue = (anvil.secrets.get_secret(name) for name in _SECRET_NAMES)
+    self_thing = Thing(id=thing_id, secret=secret, message_queue=message_queue, event_queue=event_queue)
+
+    # Shared by the broker and the authenticator. HTTP/2 multiplexes concurrent requests over a single warm connection.
+    client = httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+    return Broker(self_thing, client=client)
+
+
+def new_async_client() -> httpx.AsyncClient:
+    """Create an async HTTP client for the async broker methods.
+
+    The connections of an async client are bound to the event loop they were opened on, so a new client has to be
+    created for every event loop (e.g. every `asyncio.run`) and closed before the loop ends.
+
+    Returns:
+        httpx.AsyncClient: A new async client with the same settings as the synchronous client.
+    """
+    return httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
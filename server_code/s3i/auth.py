@@ -1,7 +1,8 @@
 """Define the authenticators for the S³I Identity Provider, including token management and credential handling."""
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Optional
 
 import httpx
@@ -13,11 +14,16 @@ logger = s3i_logger.getChild("auth")
 
 DEFAULT_IDP_URL = "https://idp.s3i.vswf.dev/auth/realms/KWH/protocol/openid-connect/token"
 
+# Tokens are treated as expired this long before their actual expiry to avoid racing the server clock.
+EXPIRY_MARGIN = timedelta(seconds=30)
 
-@dataclass
+
+@dataclass(frozen=True)
 class Token:
     """Represents an authentication token, including refresh details.
 
+    The token is immutable, so the full token string and the authorization header are computed once on construction.
+
     Attributes:
         auth_scheme (str): The type of token, such as 'Bearer'.
         token_content (str): The main token string.
@@ -31,6 +37,14 @@ class Token:
     expires_at: datetime
     refresh_token: str
     refresh_expires_at: datetime
+    _full_token: str = field(init=False, repr=False, compare=False)
+    _header: MappingProxyType = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Precompute the full token string and the read-only authorization header."""
+        full_token = f"{self.auth_scheme} {self.token_content}"
+        object.__setattr__(self, "_full_token", full_token)
+        object.__setattr__(self, "_header", MappingProxyType({"Authorization": full_token}))
 
     @property
     def expired(self) -> bool:
@@ -39,7 +53,7 @@ class Token:
         Returns:
             bool: True if the token is expired, False otherwise.
         """
-        return datetime.now() < self.expires_at
+        return datetime.now() >= self.expires_at - EXPIRY_MARGIN
 
     @property
     def refresh_expired(self) -> bool:
@@ -48,7 +62,7 @@ class Token:
         Returns:
             bool: True if the refresh token is expired, False otherwise.
         """
-        return datetime.now() < self.refresh_expires_at
+        return datetime.now() >= self.refresh_expires_at - EXPIRY_MARGIN
 
     @property
     def full_token(self) -> str:
@@ -57,16 +71,16 @@ class Token:
         Returns:
             str: The full token including its scheme.
         """
-        return f"{self.auth_scheme} {self.token_content}"
+        return self._full_token
 
     @property
-    def header(self) -> dict:
-        """Generate the authorization header.
+    def header(self) -> MappingProxyType:
+        """Return the authorization header.
 
         Returns:
-            dict: The authorization header containing the token.
+            MappingProxyType: A read-only mapping containing the authorization header.
         """
-        return {"Authorization": self.full_token}
+        return self._header
 
 
 class BaseAuthenticator:
@@ -108,7 +122,11 @@ class BaseAuthenticator:
             logger.debug("Token is still valid.")
         elif self.__token and not self.__token.refresh_expired:
             logger.debug("Token is expired, but refresh token is still valid.")
-            self.__token = self._refresh_token()
+            try:
+                self.__token = self._refresh_token()
+            except AuthenticationException as e:
+                logger.warning("Refreshing the token failed, requesting a new one instead: %s", e)
+                self.__token = self._get_token_from_idp()
         else:
             logger.debug("Token is expired and refresh token is also expired.")
             self.__token = self._get_token_from_idp()
@@ -132,7 +150,7 @@ class BaseAuthenticator:
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
         payload = self._build_auth_payload()  # Abstract method to be overridden
 
-        logger.trace(f"Starting request to {self.idp_url}.")
+        logger.trace("Starting request to %s.", self.idp_url)
         response = self.client.post(self.idp_url, headers=headers, data=payload)
 
         if response.status_code >= 400:
@@ -148,14 +166,7 @@ class BaseAuthenticator:
                 response=response.text,
             )
 
-        resp_json = response.json()
-        return Token(
-            auth_scheme=resp_json.get("token_type"),
-            token_content=resp_json.get("access_token"),
-            expires_at=datetime.now() + timedelta(seconds=resp_json["expires_in"]),
-            refresh_token=resp_json.get("refresh_token"),
-            refresh_expires_at=datetime.now() + timedelta(seconds=resp_json["refresh_expires_in"]),
-        )
+        return self._token_from_response(response)
 
     def _refresh_token(self) -> Token:
         """Refresh the current token using the refresh token.
@@ -167,12 +178,13 @@ class BaseAuthenticator:
             AuthenticationException: If refreshing the token fails.
         """
         headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        # The Identity Provider requires confidential clients to authenticate on refresh as well.
         payload = {
             "grant_type": "refresh_token",
             "refresh_token": self.__token.refresh_token,
-        }
+        } | self._build_client_credentials()
 
-        logger.trace(f"Starting request to {self.idp_url}.")
+        logger.trace("Starting request to %s.", self.idp_url)
         response = self.client.post(self.idp_url, headers=headers, data=payload)
 
         if response.status_code >= 400:
@@ -182,6 +194,27 @@ class BaseAuthenticator:
                 response=response.text,
             )
 
+        return self._token_from_response(response)
+
+    @staticmethod
+    def _token_from_response(response: httpx.Response) -> Token:
+        """Build a token from a successful response of the Identity Provider.
+
+        Args:
+            response (httpx.Response): The response containing the token details.
+
+        Returns:
+            Token: The token described by the response.
+        """
+        resp_json = response.json()
+        return Token(
+            auth_scheme=resp_json.get("token_type"),
+            token_content=resp_json.get("access_token"),
+            expires_at=datetime.now() + timedelta(seconds=resp_json["expires_in"]),
+            refresh_token=resp_json.get("refresh_token"),
+            refresh_expires_at=datetime.now() + timedelta(seconds=resp_json["refresh_expires_in"]),
+        )
+
     def _build_auth_payload(self) -> dict:
         """Abstract method to build the payload for authentication.
 
@@ -190,6 +223,14 @@ class BaseAuthenticator:
         """
         raise NotImplementedError("This method should be implemented by subclasses.")
 
+    def _build_client_credentials(self) -> dict:
+        """Abstract method to build the client credentials sent along with a token refresh.
+
+        Raises:
+            NotImplementedError: If the method is not implemented in a subclass.
+        """
+        raise NotImplementedError("This method should be implemented by subclasses.")
+
 
 class ClientAuthenticator(BaseAuthenticator):
     """Authenticator for client credentials grant type, providing client ID and secret."""
@@ -219,11 +260,15 @@ class ClientAuthenticator(BaseAuthenticator):
         Returns:
             dict: The payload with client credentials.
         """
-        return {
-            "grant_type": "client_credentials",
-            "client_id": self.__id,
-            "client_secret": self.__secret,
-        }
+        return {"grant_type": "client_credentials"} | self._build_client_credentials()
+
+    def _build_client_credentials(self) -> dict:
+        """Build the client credentials.
+
+        Returns:
+            dict: The client ID and secret.
+        """
+        return {"client_id": self.__id, "client_secret": self.__secret}
 
 
 class PasswordAuthenticator(BaseAuthenticator):
@@ -271,3 +316,11 @@ class PasswordAuthenticator(BaseAuthenticator):
             else {}
         )
         return payload
+
+    def _build_client_credentials(self) -> dict:
+        """Build the client credentials.
+
+        Returns:
+            dict: The client ID and secret.
+        """
+        return {"client_id": self.__id, "client_secret": self.__secret}
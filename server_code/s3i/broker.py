@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from typing import Optional
 
 import httpx
+import orjson
+from pydantic import BaseModel
 
 from . import auth, exceptions, s3i_logger
 
@@ -45,6 +47,10 @@ class Thing:
 class Broker:
     """A client for interacting with the S3I Broker, supporting message sending and receiving.
 
+    Every request method has an async variant (`asend`, `areceive`) that takes the async HTTP client to use, as async
+    clients are bound to a single event loop. The token is still obtained synchronously, which only blocks the event
+    loop when the token has to be renewed.
+
     Attributes:
         broker_url (str): The URL of the broker.
         client (httpx.Client): The HTTP client used for making requests.
@@ -74,17 +80,25 @@ class Broker:
         self.message_queue = self_thing.message_queue
         self.event_queue = self_thing.event_queue
 
+        # Parsed once, so httpx does not have to parse the URL again for every request.
+        self._receive_urls = {
+            (event, all): httpx.URL(f"{self.broker_url}/{endpoint}{'/all' if all else ''}")
+            for event, endpoint in ((False, self.message_queue), (True, self.event_queue))
+            for all in (False, True)
+        }
+        self._send_urls: dict[str, httpx.URL] = {}
+
     def __del__(self):
         """Closes the HTTP client if it was not provided externally."""
         if not self.external_client:
             self.client.close()
 
-    def send(self, endpoint: str, message: dict) -> tuple[int, str]:
+    def send(self, endpoint: str, message: dict | BaseModel) -> tuple[int, str]:
         """Send a message to the message broker.
 
         Args:
             endpoint (str): The endpoint to send the message to.
-            message (dict): The message to send.
+            message (dict | BaseModel): The message to send.
 
         Returns:
             tuple[int, str]: The status code and response text.
@@ -92,18 +106,70 @@ class Broker:
         Raises:
             exceptions.S3IException: If the message sending fails.
         """
-        token = self.auth.obtain_token()
-        headers = {"Content-Type": "application/json"} | token.header
-        url = f"{self.broker_url}/{endpoint}"
+        request = self._build_send_request(self.client, endpoint, message)
+        response = self.client.send(request)
+        return self._handle_send_response(endpoint, message, response)
 
-        logger.trace(f"Sending request to {url}.")
-        response = self.client.post(url, headers=headers, json=message)
+    async def asend(self, client: httpx.AsyncClient, endpoint: str, message: dict | BaseModel) -> tuple[int, str]:
+        """Send a message to the message broker asynchronously with the given client. See `send` for details."""
+        request = self._build_send_request(client, endpoint, message)
+        response = await client.send(request)
+        return self._handle_send_response(endpoint, message, response)
 
+    def receive(self, event: bool = False, all: bool = False) -> tuple[int, str] | list[dict] | None:
+        """Receive a message from the message broker.
+
+        Args:
+            event (bool, optional): Whether to receive an event message. Defaults to False.
+            all (bool, optional): Whether to retrieve all available messages in a single request. Defaults to False.
+
+        Returns:
+            tuple[int, str]: The status code and response text if a single message is received.
+            list[dict]: The decoded messages if `all` is True. Empty if no message is available.
+            None: If no message is available and `all` is False.
+
+        Raises:
+            exceptions.S3IException: If the message retrieval fails.
+        """
+        endpoint, request = self._build_receive_request(self.client, event, all)
+        response = self.client.send(request)
+        return self._handle_receive_response(endpoint, all, response)
+
+    async def areceive(
+        self, client: httpx.AsyncClient, event: bool = False, all: bool = False
+    ) -> tuple[int, str] | list[dict] | None:
+        """Receive a message from the message broker asynchronously with the given client. See `receive` for details."""
+        endpoint, request = self._build_receive_request(client, event, all)
+        response = await client.send(request)
+        return self._handle_receive_response(endpoint, all, response)
+
+    def _build_send_request(
+        self, client: httpx.Client | httpx.AsyncClient, endpoint: str, message: dict | BaseModel
+    ) -> httpx.Request:
+        """Build the request for sending a message to the given endpoint."""
+        token = self.auth.obtain_token()
+        headers = {"Content-Type": "application/json"} | token.header
+        url = self._send_urls.get(endpoint)
+        if url is None:
+            url = self._send_urls[endpoint] = httpx.URL(f"{self.broker_url}/{endpoint}")
+
+        logger.trace("Sending request to %s.", url)
+        # Serialized with orjson, or directly by pydantic for models, instead of httpx's stdlib json encoding.
+        if isinstance(message, BaseModel):
+            content = message.model_dump_json(by_alias=True).encode()
+        else:
+            content = orjson.dumps(message)
+        return client.build_request("POST", url, headers=headers, content=content)
+
+    def _handle_send_response(
+        self, endpoint: str, message: dict | BaseModel, response: httpx.Response
+    ) -> tuple[int, str]:
+        """Check the response of a send request."""
         if response.status_code != 201:
             raise exceptions.S3IException(
                 f"Failed to send message to {endpoint}.",
                 headers=response.headers,
-                body=message,
+                body=message.model_dump_json(by_alias=True) if isinstance(message, BaseModel) else message,
                 status_code=response.status_code,
                 response=response.text,
             )
@@ -111,28 +177,21 @@ class Broker:
 
         return response.status_code, response.text
 
-    def receive(self, event: bool = False, all: bool = False) -> tuple[int, str] | None:
-        """Receive a message from the message broker.
-
-        Args:
-            event (bool, optional): Whether to receive an event message. Defaults to False.
-            all (bool, optional): Whether to retrieve all available messages. Defaults to False.
-
-        Returns:
-            tuple[int, str]: The status code and response text if a message is received.
-            None: If no message is available.
-
-        Raises:
-            exceptions.S3IException: If the message retrieval fails.
-        """
+    def _build_receive_request(
+        self, client: httpx.Client | httpx.AsyncClient, event: bool, all: bool
+    ) -> tuple[str, httpx.Request]:
+        """Build the endpoint and the request for receiving messages."""
         endpoint = self.event_queue if event else self.message_queue
         token = self.auth.obtain_token()
-        headers = token.header
-        url = f"{self.broker_url}/{endpoint}{'/all' if all else ''}"
+        url = self._receive_urls[event, all]
 
-        logger.trace(f"Sending request to {url}.")
-        response = self.client.get(url, headers=headers)
+        logger.trace("Sending request to %s.", url)
+        return endpoint, client.build_request("GET", url, headers=token.header)
 
+    def _handle_receive_response(
+        self, endpoint: str, all: bool, response: httpx.Response
+    ) -> tuple[int, str] | list[dict] | None:
+        """Check and decode the response of a receive request."""
         if response.status_code != 200:
             raise exceptions.S3IException(
                 f"Failed to get message from {endpoint}.",
@@ -142,8 +201,16 @@ class Broker:
             )
         logger.success("Message received successfully.")
 
-        if response.text == "":
+        # Checked on the raw body, so a large batch is not decoded into a str just to test whether it is empty.
+        if not response.content:
             logger.trace("No message received.")
-            return None
+            return [] if all else None
+
+        if all:
+            # The /all endpoint returns a JSON array containing every queued message. It is parsed exactly once here and
+            # the resulting dicts are validated by the callers using `model_validate`.
+            messages = orjson.loads(response.content)
+            logger.trace("Received %d messages.", len(messages))
+            return messages
 
         return response.status_code, response.text
@@ -1,5 +1,14 @@
 """Define exceptions that can be raised by the S³I client."""
 
+import orjson
+
+
+def _format_metadata(value) -> str:
+    """Format a metadata value of an exception. Dicts are serialized with orjson, everything else is used as is."""
+    if isinstance(value, dict):
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return str(value)
+
 
 class S3IException(Exception):
     """Base exception for all S³I-related exceptions."""
@@ -36,11 +45,11 @@ class S3IException(Exception):
         if self.headers is not None:
             metadata.append(f"Headers: {self.headers}")
         if self.body is not None:
-            metadata.append(f"Body: {self.body}")
+            metadata.append(f"Body: {_format_metadata(self.body)}")
         if self.status_code is not None:
             metadata.append(f"Status Code: {self.status_code}")
         if self.response is not None:
-            metadata.append(f"Response: {self.response}")
+            metadata.append(f"Response: {_format_metadata(self.response)}")
 
         # Join all metadata into a single string
         return f"{base_message} {'| '.join(metadata)}".strip()
@@ -1,8 +1,8 @@
 """Defines the different message models for the S3I Broker (Currently incomplete)."""
 
-from typing import Any, Literal, Union
+from typing import Annotated, Any, Literal, Union
 
-from pydantic import BaseModel, Field, RootModel
+from pydantic import BaseModel, Field, RootModel, TypeAdapter
 
 
 class S3IMessageBodyBase(BaseModel):
@@ -32,12 +32,22 @@ class GetValueReplyBody(S3IMessageBodyBase):
 
 # TODO: Add the other message types here
 
+S3IMessageBody = Annotated[
+    Union[
+        GetValueRequestBody,
+        GetValueReplyBody,
+        # Add the other message types here
+    ],
+    Field(discriminator="messageType"),
+]
+
 
 class S3IMessage(RootModel):
     """The root model for all S3I messages."""
 
-    root: Union[
-        GetValueRequestBody,
-        GetValueReplyBody,
-        # Add the other message types here
-    ] = Field(discriminator="messageType")
+    root: S3IMessageBody
+
+
+# Compiled once at import. Validates directly into the message body, skipping the `S3IMessage` wrapper.
+_BODY_ADAPTER = TypeAdapter(S3IMessageBody)
+validate_s3i_message = _BODY_ADAPTER.validate_python
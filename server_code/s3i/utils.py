@@ -1,8 +1,8 @@
 """Some utility functions related to s3i."""
 
-import uuid
+import secrets
 
 
 def generate_message_identifier() -> str:
     """Generate a random, unique message identifier."""
-    return f"s3i:{str(uuid.uuid4())}"
+    return f"s3i:{secrets.token_hex(16)}"